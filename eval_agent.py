@@ -3,15 +3,16 @@ Evaluate a local agent on a remote server.
 """
 
 from argparse import ArgumentParser, Namespace
-from json import JSONDecodeError
+from io import BufferedReader
+import mmap
+from operator import itemgetter
 from pathlib import Path
 import pickle
 import socket
 import sys
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, cast
 import uuid
 from uuid import UUID
-import zlib
 
 import numpy as np
 import ray
@@ -36,6 +37,8 @@ from hearts_gym.utils import ObsTransform
 from hearts_gym.utils.typing import Observation, Reward
 
 SERVER_TIMEOUT_SEC = HeartsServer.PRINT_INTERVAL_SEC + 5
+MIN_SOCKET_RECEIVE_BYTES = 1 << 20
+"""Minimum size of the kernel receive buffer of the client socket."""
 
 
 def parse_args() -> Namespace:
@@ -145,91 +148,87 @@ def configure_remote_eval(config: TrainerConfigDict) -> TrainerConfigDict:
     return eval_config
 
 
-def _is_done(num_games: int, max_num_games: Optional[int]) -> bool:
-    """Return whether the desired number of games have been played..
-
-    Returns:
-        bool: Whether the desired number of games have been played.
-    """
-    return HeartsRequestHandler.is_done(num_games, max_num_games)
-
-
 def _receive_data_shard(
-        client: socket.socket,
-        max_receive_bytes: int,
+        reader: BufferedReader,
+        num_bytes: int,
 ) -> bytes:
-    """Return a message received from the server in a failsafe way.
+    """Return exactly the given amount of bytes received from the server
+    in a failsafe way.
 
     If the server stopped, exit the program.
 
     Args:
-        client (socket.socket): Socket of the client.
-        max_receive_bytes (int): Number of bytes to receive at maximum.
+        reader (BufferedReader): Buffered reader wrapping the socket of
+            the client.
+        num_bytes (int): Number of bytes to receive.
 
     Returns:
-        Any: Message data received.
+        bytes: Message data received.
     """
     try:
-        data = client.recv(max_receive_bytes)
+        data = reader.read(num_bytes)
     except Exception:
         print('Unable to receive data from server.')
         raise
 
-    if data == b'' or data is None:
+    if data is None or len(data) < num_bytes:
         print('Server stopped. Exiting...')
         sys.exit(0)
 
     return data
 
 
-def _receive_msg_length(
-        client: socket.socket,
-        max_receive_bytes: int,
-) -> Tuple[int, bytes]:
+def _receive_msg_length(reader: BufferedReader) -> int:
     """Return the expected length of a message received from the server
     in a failsafe way.
 
-    To be more efficient, receive more data than necessary. Any
-    additional data is returned.
+    Only the length prefix is consumed; the rest of the message stays
+    buffered in the reader.
 
     If the server stopped, exit the program.
 
     Args:
-        client (socket.socket): Socket of the client.
-        max_receive_bytes (int): Number of bytes to receive at maximum
-            per message shard.
+        reader (BufferedReader): Buffered reader wrapping the socket of
+            the client.
 
     Returns:
         int: Amount of bytes in the rest of the message.
-        bytes: Extraneous part of message data received.
     """
-    data_shard = _receive_data_shard(client, max_receive_bytes)
-    total_num_received_bytes = len(data_shard)
-    data = [data_shard]
-    length_end = data_shard.find(server_utils.MSG_LENGTH_SEPARATOR)
-    while (
-            length_end == -1
-            and total_num_received_bytes < server_utils.MAX_MSG_PREFIX_LENGTH
-    ):
-        data_shard = _receive_data_shard(client, max_receive_bytes)
-        total_num_received_bytes += len(data_shard)
-        data.append(data_shard)
-        length_end = data_shard.find(server_utils.MSG_LENGTH_SEPARATOR)
+    length_struct = server_utils.MSG_LENGTH_STRUCT
+    length_prefix = _receive_data_shard(reader, length_struct.size)
+    (msg_length,) = length_struct.unpack(length_prefix)
+    return msg_length
+
+
+def _receive_data_into(
+        reader: BufferedReader,
+        buffer: memoryview,
+) -> None:
+    """Fill the given buffer with data received from the server in a
+    failsafe way.
 
-    assert length_end != -1, 'server did not send message length'
+    If the server stopped, exit the program.
 
-    length_end += total_num_received_bytes - len(data_shard)
-    data = b''.join(data)
-    msg_length = int(data[:length_end])
-    extra_data = data[length_end + len(server_utils.MSG_LENGTH_SEPARATOR):]
+    Args:
+        reader (BufferedReader): Buffered reader wrapping the socket of
+            the client.
+        buffer (memoryview): Buffer to receive exactly as many bytes
+            into as fit.
+    """
+    try:
+        num_received_bytes = reader.readinto(buffer)
+    except Exception:
+        print('Unable to receive data from server.')
+        raise
 
-    return msg_length, extra_data
+    if num_received_bytes is None or num_received_bytes < len(buffer):
+        print('Server stopped. Exiting...')
+        sys.exit(0)
 
 
 def receive_data(
-        client: socket.socket,
-        max_receive_bytes: int,
-        max_total_receive_bytes: int,
+        reader: BufferedReader,
+        receive_buffer: memoryview,
 ) -> Any:
     """Return data received from the server in a failsafe way.
 
@@ -237,43 +236,33 @@ def receive_data(
     decoded, return an error message string.
 
     Args:
-        client (socket.socket): Socket of the client.
-        max_receive_bytes (int): Number of bytes to receive at maximum
-            per message shard.
-        max_total_receive_bytes (int): Number of bytes to receive at
-            maximum, that is, summed over all message shards.
+        reader (BufferedReader): Buffered reader wrapping the socket of
+            the client.
+        receive_buffer (memoryview): Buffer to receive the message
+            into; is reused between messages. Its size is the maximum
+            number of bytes a message may have.
 
     Returns:
         Any: Data received or an error message string if there
             were problems.
     """
-    msg_length, data_shard = _receive_msg_length(client, max_receive_bytes)
-    assert msg_length < max_total_receive_bytes, 'message is too long'
-
-    total_num_received_bytes = len(data_shard)
-    data = [data_shard]
-    while total_num_received_bytes < msg_length:
-        data_shard = _receive_data_shard(client, max_receive_bytes)
-        total_num_received_bytes += len(data_shard)
-        data.append(data_shard)
-
-    assert total_num_received_bytes == msg_length, \
-        'message does not match length'
+    msg_length = _receive_msg_length(reader)
+    assert msg_length <= len(receive_buffer), 'message is too long'
 
-    data = b''.join(data)
+    data = receive_buffer[:msg_length]
+    _receive_data_into(reader, data)
     try:
-        data = server_utils.decode_data(data)
-    except (JSONDecodeError, zlib.error) as ex:
-        print('Failed decoding:', data)
+        return server_utils.decode_data(data)
+    except server_utils.DECODE_ERRORS as ex:
+        print('Failed decoding:', bytes(data))
         print('Error message:', str(ex))
         return '[See decoding error message.]'
-    return data
 
 
 def wait_for_data(
         client: socket.socket,
-        max_receive_bytes: int,
-        max_total_receive_bytes: int,
+        reader: BufferedReader,
+        receive_buffer: memoryview,
 ) -> Any:
     """Continually receive data from the server the given client is
     connected to.
@@ -283,87 +272,138 @@ def wait_for_data(
 
     Args:
         client (socket.socket): Socket of the client.
-        max_receive_bytes (int): Number of bytes to receive at maximum
-            per message shard.
-        max_total_receive_bytes (int): Number of bytes to receive at
-            maximum per single message, that is, summed over all
-            message shards of a single message.
+        reader (BufferedReader): Buffered reader wrapping the socket of
+            the client.
+        receive_buffer (memoryview): Buffer to receive messages into;
+            is reused between messages. Its size is the maximum number
+            of bytes a single message may have.
 
     Returns:
         Any: Non-string data received.
     """
-    data = receive_data(client, max_receive_bytes, max_total_receive_bytes)
+    data = receive_data(reader, receive_buffer)
     while isinstance(data, str):
         server_utils.send_ok(client)
         print('Server says:', data)
-        data = receive_data(client, max_receive_bytes, max_total_receive_bytes)
+        data = receive_data(reader, receive_buffer)
     return data
 
 
-def _take_indices(data: List[Any], indices: List[int]) -> List[Any]:
+def _make_reader(client: socket.socket) -> BufferedReader:
+    """Return a buffered reader wrapping the given socket.
+
+    All receiving goes through this reader so we do not lose any
+    buffered data. The reader must be closed together with the socket;
+    otherwise, the connection stays open until it is garbage-collected.
+
+    Args:
+        client (socket.socket): Socket of the client.
+
+    Returns:
+        BufferedReader: Buffered reader wrapping the socket.
+    """
+    # A positive buffer size always returns a `BufferedReader`; the
+    # stubs only know about `IOBase`.
+    return cast(BufferedReader, client.makefile(
+        'rb', buffering=server_utils.MAX_RECEIVE_BYTES))
+
+
+def _allocate_receive_buffer(num_bytes: int) -> memoryview:
+    """Return a page-aligned, writable buffer of the given size.
+
+    The memory is mapped anonymously and its size is rounded up to
+    whole pages.
+
+    Args:
+        num_bytes (int): Minimum size of the buffer in bytes.
+
+    Returns:
+        memoryview: Buffer of exactly `num_bytes` bytes.
+    """
+    num_pages = -(-num_bytes // mmap.PAGESIZE)
+    buffer = mmap.mmap(-1, num_pages * mmap.PAGESIZE)
+    return memoryview(buffer)[:num_bytes]
+
+
+def _take_indices(data: List[Any], indices: Sequence[int]) -> List[Any]:
     """Return the elements obtained by indexing into the given data
     according to the given indices.
 
     Args:
         data (List[Any]): List to multi-index.
-        indices (List[int]): Indices to use; are used in the
+        indices (Sequence[int]): Indices to use; are used in the
             order they are given in.
 
     Returns:
         List[Any]: Elements obtained by multi-indexing into the
             given data.
     """
-    return [data[i] for i in indices]
+    if len(indices) < 2:
+        # `itemgetter` does not return a tuple for a single index.
+        return [data[i] for i in indices]
+    return list(itemgetter(*indices)(data))
 
 
-def _update_indices(
-        values: List[Any],
-        indices: List[int],
-        new_values: List[Any],
-) -> None:
-    """Update the given list of values with new elements according to
-    the given indices.
+def _is_attention_model(agent: Trainable) -> bool:
+    """Return whether the given agent uses an attention model.
 
     Args:
-        values (List[Any]): List to multi-update.
-        indices (List[int]): Indices to use; are used in the
-            order they are given in.
-        new_values (List[Any]): Updated values; one for each index.
+        agent (Trainable): Reinforcement learning trainer/agent.
+
+    Returns:
+        bool: Whether the agent's model is an attention model.
     """
-    assert len(indices) == len(new_values), \
-        'length of indices to update and values to update with must match'
-    for (i, new_val) in zip(indices, new_values):
-        values[i] = new_val
+    model_config = utils.get_default(agent.config, 'model', COMMON_CONFIG)
+
+    return (
+        utils.get_default(
+            model_config, 'use_attention', MODEL_DEFAULTS)
+        or (
+            (
+                utils.get_default(
+                    model_config, 'custom_model', MODEL_DEFAULTS)
+                is not None
+            )
+            and model_config.get(
+                'custom_model', '').endswith('_attn')
+        )
+    )
 
 
-def _update_states(
-        agent: Trainable,
+def _update_states_and_actions(
+        is_attention_model: bool,
         states: List[List[TensorType]],
+        prev_actions: List[Optional[TensorType]],
         indices: List[int],
         new_states: List[List[TensorType]],
-):
-    model_config = utils.get_default(agent.config, 'model', COMMON_CONFIG)
+        actions: TensorType,
+) -> None:
+    """Update the recurrent states and previous actions at the given
+    indices in a single pass.
 
-    if (
-            utils.get_default(
-                model_config, 'use_attention', MODEL_DEFAULTS)
-            or (
-                (
-                    utils.get_default(
-                        model_config, 'custom_model', MODEL_DEFAULTS)
-                    is not None
-                )
-                and model_config.get(
-                    'custom_model', '').endswith('_attn')
-            )
-    ):
-        for (i, new_state) in zip(indices, new_states):
+    Args:
+        is_attention_model (bool): Whether the states belong to an
+            attention model, in which case the new states are appended
+            to the state history instead of replacing the previous ones.
+        states (List[List[TensorType]]): Recurrent states to update.
+        prev_actions (List[Optional[TensorType]]): Previous actions
+            to update.
+        indices (List[int]): Indices of the games to update.
+        new_states (List[List[TensorType]]): New recurrent states in
+            order of `indices`.
+        actions (TensorType): Actions taken in order of `indices`.
+    """
+    if is_attention_model:
+        for (i, new_state, action) in zip(indices, new_states, actions):
             for (j, (prev_state, state)) in enumerate(
                     zip(states[i], new_state),
             ):
                 states[i][j] = np.vstack((prev_state[1:], state))
+            prev_actions[i] = action
     else:
-        _update_indices(states, indices, new_states)
+        for (i, new_state, action) in zip(indices, new_states, actions):
+            states[i] = new_state
+            prev_actions[i] = action
 
 
 def _transform_observations(
@@ -427,7 +467,8 @@ def main() -> None:
 
     ray.init()
 
-    with server_utils.create_client() as client:
+    with server_utils.create_client() as client, \
+            _make_reader(client) as reader:
         client.connect((args.server_address, args.port))
         client.settimeout(SERVER_TIMEOUT_SEC)
         print('Connected to server.')
@@ -435,8 +476,8 @@ def main() -> None:
 
         metadata = wait_for_data(
             client,
-            server_utils.MAX_RECEIVE_BYTES,
-            server_utils.MAX_RECEIVE_BYTES,
+            reader,
+            memoryview(bytearray(server_utils.MAX_RECEIVE_BYTES)),
         )
         player_index = metadata['player_index']
         num_players = metadata['num_players']
@@ -449,8 +490,23 @@ def main() -> None:
 
         max_total_receive_bytes = \
             server_utils.MAX_RECEIVE_BYTES * num_parallel_games
-        # We only get strings as keys.
-        str_player_index = str(player_index)
+        # Let the kernel buffer a whole batch of observations so it
+        # arrives in as few reads as possible.
+        socket_receive_bytes = max(
+            2 * max_total_receive_bytes,
+            MIN_SOCKET_RECEIVE_BYTES,
+        )
+        if (
+                client.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+                < socket_receive_bytes
+        ):
+            client.setsockopt(
+                socket.SOL_SOCKET,
+                socket.SO_RCVBUF,
+                socket_receive_bytes,
+            )
+        # Allocate once and receive every message into this.
+        receive_buffer = _allocate_receive_buffer(max_total_receive_bytes)
 
         if conf.allow_pickles and has_params:
             with open(params_path, 'rb') as params_file:
@@ -498,45 +554,69 @@ def main() -> None:
         obs_transforms = utils.get_default(
             config, 'env_config', COMMON_CONFIG).get('obs_transforms', [])
 
+        # The initial state never changes, so query it only once.
+        init_state = utils.get_initial_state(agent, LEARNED_POLICY_ID)
+        is_attention_model = _is_attention_model(agent)
+
+        is_done = HeartsRequestHandler.is_done
+
         num_iters = 0
         num_games = 0
-        while not _is_done(num_games, max_num_games):
+        while not is_done(num_games, max_num_games):
             uuids = [uuid.uuid4() for _ in range(num_parallel_games)]
-            states: List[List[TensorType]] = [
-                utils.get_initial_state(agent, LEARNED_POLICY_ID)
-                for _ in range(num_parallel_games)
-            ]
+            states: List[List[TensorType]]
+            if len(init_state) == 0:
+                # Empty states are never modified, so they can be shared.
+                states = [init_state] * num_parallel_games
+            else:
+                # Attention states are replaced element-wise, so each
+                # game needs its own list. The initial tensors are never
+                # modified in-place and can be shared.
+                states = [
+                    list(init_state)
+                    for _ in range(num_parallel_games)
+                ]
             prev_actions: List[Optional[TensorType]] = \
                 [None] * num_parallel_games
             prev_rewards: List[Optional[Reward]] = \
                 [None] * num_parallel_games
+            checked_obs_keys = False
 
             while True:
-                data = wait_for_data(
-                    client,
-                    server_utils.MAX_RECEIVE_BYTES,
-                    max_total_receive_bytes,
-                )
-
-                if len(data) == 0:
+                # Communication happens in lock-step: the server only
+                # sends new observations once it received the actions of
+                # all clients. So there is nothing we could already
+                # receive while computing actions; receive synchronously.
+                data = wait_for_data(client, reader, receive_buffer)
+
+                # Data arrives column-oriented; see
+                # `HeartsRequestHandler._distribute_return_data`.
+                indices = data[server_utils.INDICES_KEY]
+                if len(indices) == 0:
                     # We have no observations; send no actions.
                     server_utils.send_actions(client, [])
-
-                if len(data[0]) < 4:
-                    (indices, obss) = zip(*data)
-                else:
-                    (indices, obss, rewards, is_dones, infos) = zip(*data)
-                    rewards = [
-                        reward[str_player_index]
-                        for reward in rewards
-                    ]
-                    _update_indices(prev_rewards, indices, rewards)
-
-                    if is_dones[0]['__all__']:
+                    continue
+
+                obss = data[server_utils.OBS_KEY]
+                if server_utils.REWARDS_KEY in data:
+                    # Write directly to avoid an intermediate list.
+                    for (i, reward) in zip(
+                            indices,
+                            data[server_utils.REWARDS_KEY],
+                    ):
+                        prev_rewards[i] = reward[player_index]
+
+                    if data[server_utils.IS_DONES_KEY][0]['__all__']:
                         break
-                assert all(str_player_index in obs for obs in obss), \
-                    'received wrong data'
-                obss = [obs[str_player_index] for obs in obss]
+                if not checked_obs_keys:
+                    # The server sends the same kind of data throughout a
+                    # game, so checking the first batch suffices.
+                    assert all(player_index in obs for obs in obss), \
+                        'received wrong data'
+                    checked_obs_keys = True
+                # Reuse the received list for our own observations.
+                for (i, obs) in enumerate(obss):
+                    obss[i] = obs[player_index]
                 _transform_observations(
                     obs_transforms,
                     remove_action_mask,
@@ -569,10 +649,17 @@ def main() -> None:
 
                 server_utils.send_actions(client, actions)
 
-                _update_states(agent, states, indices, new_states)
-                _update_indices(prev_actions, indices, actions)
+                _update_states_and_actions(
+                    is_attention_model,
+                    states,
+                    prev_actions,
+                    indices,
+                    new_states,
+                    actions,
+                )
 
-            server_utils.send_ok(client)
+            # The server follows up with the results table, which
+            # `wait_for_data` acknowledges in the next round.
             num_games += num_parallel_games
             num_iters += 1
 
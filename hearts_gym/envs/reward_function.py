@@ -20,6 +20,14 @@ class RewardFunction:
         self.env = env
         self.game = env.game
 
+        # These do not change over the lifetime of a game, so we
+        # compute them only once.
+        self._max_num_cards_on_hand = self.game.max_num_cards_on_hand
+        self._illegal_reward = \
+            -self.game.max_penalty * self._max_num_cards_on_hand
+        self._shot_the_moon_reward = \
+            self.game.max_penalty * self._max_num_cards_on_hand
+
     def __call__(self, *args, **kwargs) -> Reward:
         return self.compute_reward(*args, **kwargs)
 
@@ -50,12 +58,15 @@ class RewardFunction:
         Returns:
             Reward: Reward for the player with the given index.
         """
-        if self.game.prev_was_illegals[player_index]:
-            return -self.game.max_penalty * self.game.max_num_cards_on_hand
+        game = self.game
+        max_num_cards_on_hand = self._max_num_cards_on_hand
+
+        if game.prev_was_illegals[player_index]:
+            return self._illegal_reward
 
-        card = self.game.prev_played_cards[player_index]
-        leading_suit = self.game.prev_leading_suit
-        hands_info_players = self.game.prev_hands[player_index]
+        card = game.prev_played_cards[player_index]
+        leading_suit = game.prev_leading_suit
+        hands_info_players = game.prev_hands[player_index]
         
        # prev_hands_check = self.game.prev_hands()
         """ Implementing a reward for the following case:
@@ -65,21 +76,21 @@ class RewardFunction:
             3. Then reward the agent"""
             
         if card != leading_suit and leading_suit == Card.SUIT_HEART:
-            return self.game.max_num_cards_on_hand
+            return max_num_cards_on_hand
          
         if leading_suit == Card.SUIT_CLUB and card != Card.SUIT_CLUB and hands_info_players == Card.SUIT_HEART:
-            return self.game.max_num_cards_on_hand
+            return max_num_cards_on_hand
         
         if leading_suit == Card.SUIT_DIAMOND and card != Card.SUIT_DIAMOND and hands_info_players == Card.SUIT_HEART:
-            return self.game.max_num_cards_on_hand
+            return max_num_cards_on_hand
         
         if card is None:
             # The agent did not take a turn until now; no information
             # to provide.
             return 0
 
-        if trick_is_over and self.game.has_shot_the_moon(player_index):
-            return self.game.max_penalty * self.game.max_num_cards_on_hand
+        if trick_is_over and game.has_shot_the_moon(player_index):
+            return self._shot_the_moon_reward
         
         
         #if prev_hands_check != Card.SUIT_CLUB:
@@ -89,10 +100,11 @@ class RewardFunction:
         # if self.game.is_done():
         #     return -penalty
         "Penalizing more for the case when the player gets a queen of spades"
-        if self.game.prev_trick_winner_index == player_index:
-            assert self.game.prev_trick_penalty is not None
-            if self.game.prev_trick_penalty==13:
-                return -self.game.prev_trick_penalty * self.game.max_num_cards_on_hand
-            return -self.game.prev_trick_penalty
+        if game.prev_trick_winner_index == player_index:
+            trick_penalty = game.prev_trick_penalty
+            assert trick_penalty is not None
+            if trick_penalty==13:
+                return -trick_penalty * max_num_cards_on_hand
+            return -trick_penalty
         return 1
         # return -penalty
@@ -259,6 +259,11 @@ class HeartsServer(TCPServer):
         )
         return client_address[0] in registered_addresses
 
+    def get_request(self) -> Tuple[Request, Address]:
+        (request, client_address) = super().get_request()
+        server_utils.disable_nagle(request)
+        return (request, client_address)
+
     def verify_request(  # type: ignore[override]
             self,
             request: Request,
@@ -1354,7 +1359,8 @@ class HeartsRequestHandler(BaseRequestHandler):
         """Convert the given data to a primitive Python type.
 
         Contrary to what the name suggests, the functionality is
-        very basic.
+        very basic. NumPy arrays of non-object type are kept as they
+        are because they can be serialized efficiently.
 
         Args:
             data (Any): Object to convert to a primitive.
@@ -1363,6 +1369,8 @@ class HeartsRequestHandler(BaseRequestHandler):
             Any: Primitive representation of `data`.
         """
         if isinstance(data, np.ndarray):
+            if not data.dtype.hasobject:
+                return data
             return list(map(HeartsRequestHandler._to_primitive, data))
         if isinstance(data, np.integer):
             return int(data)
@@ -1394,36 +1402,81 @@ class HeartsRequestHandler(BaseRequestHandler):
         self.server.logger.debug(f'Data after tree map:\n{data}')
         return server_utils.encode_data(data)
 
-    def _send_shard(
-            self,
-            player_index: int,
+    @staticmethod
+    def _empty_columns(has_step_data: bool) -> Dict[str, List[Any]]:
+        """Return empty columns for environment data to send.
+
+        Args:
+            has_step_data (bool): Whether the data to send was returned
+                by a step (as opposed to a reset) and thus contains
+                rewards, done flags and infos.
+
+        Returns:
+            Dict[str, List[Any]]: Empty list for each kind of data.
+        """
+        columns: Dict[str, List[Any]] = {
+            server_utils.INDICES_KEY: [],
+            server_utils.OBS_KEY: [],
+        }
+        if has_step_data:
+            columns[server_utils.REWARDS_KEY] = []
+            columns[server_utils.IS_DONES_KEY] = []
+            columns[server_utils.INFOS_KEY] = []
+        return columns
+
+    @staticmethod
+    def _append_row(
+            columns: Dict[str, List[Any]],
+            index: int,
             data: Union[
-                List[Tuple[int, MultiObservation]],
-                List[Tuple[
-                    int,
+                MultiObservation,
+                Tuple[
                     MultiObservation,
                     MultiReward,
                     MultiIsDone,
                     MultiInfo,
-                ]],
+                ],
             ],
     ) -> None:
-        """Send the given data to the client corresponding to the
-        given index.
+        """Append the given environment data to the given columns.
 
         Args:
-            player_index (int): Index of the client the shard should be
-                sent towards.
+            columns (Dict[str, List[Any]]): Columns to append to, as
+                returned by `_empty_columns`.
+            index (int): Index of the environment the data belongs to.
             data (Union[
-                List[Tuple[int, MultiObservation]],
-                List[Tuple[
-                    int,
+                MultiObservation,
+                Tuple[
                     MultiObservation,
                     MultiReward,
                     MultiIsDone,
                     MultiInfo,
-                ]],
-            ]): Data to send to the client.
+                ],
+            ]): Environment data to append.
+        """
+        columns[server_utils.INDICES_KEY].append(index)
+        if isinstance(data, tuple):
+            (obs, reward, is_done, info) = data
+            columns[server_utils.OBS_KEY].append(obs)
+            columns[server_utils.REWARDS_KEY].append(reward)
+            columns[server_utils.IS_DONES_KEY].append(is_done)
+            columns[server_utils.INFOS_KEY].append(info)
+        else:
+            columns[server_utils.OBS_KEY].append(data)
+
+    def _send_shard(
+            self,
+            player_index: int,
+            data: Dict[str, List[Any]],
+    ) -> None:
+        """Send the given data to the client corresponding to the
+        given index.
+
+        Args:
+            player_index (int): Index of the client the shard should be
+                sent towards.
+            data (Dict[str, List[Any]]): Column-oriented data to send
+                to the client.
         """
         data: bytes = self._encode_data(data)
         self.server.logger.debug(f'Sending to {player_index}:\n{str(data)}')
@@ -1446,7 +1499,9 @@ class HeartsRequestHandler(BaseRequestHandler):
         Send the partitioned data to each client in parallel.
 
         Distributing means to partition the data so that each client
-        receives the data meant for it.
+        receives the data meant for it. The data is sent
+        column-oriented, so each client receives one list per kind
+        of data.
 
         Args:
             return_data (Union[
@@ -1461,29 +1516,19 @@ class HeartsRequestHandler(BaseRequestHandler):
                 processed environments.
         """
         num_players = len(self.server.clients)
-        distributed_data: List[List[
-            Union[
-                Tuple[
-                    int,
-                    MultiObservation,
-                ],
-                Tuple[
-                    int,
-                    MultiObservation,
-                    MultiReward,
-                    MultiIsDone,
-                    MultiInfo,
-                ],
-            ],
-        ]] = [[] for _ in range(num_players)]
+        has_step_data = isinstance(return_data[0], tuple)
+        distributed_data: List[Dict[str, List[Any]]] = [
+            self._empty_columns(has_step_data)
+            for _ in range(num_players)
+        ]
 
-        for (i, (data, env)) in enumerate(zip(return_data, self.server.envs)):
+        for (i, env) in enumerate(self.server.envs):
             active_player_index = env.active_player_index
-            active_player_data = distributed_data[active_player_index]
-            if isinstance(data, tuple):
-                active_player_data.append((i,) + data)
-            else:
-                active_player_data.append((i, data))
+            self._append_row(
+                distributed_data[active_player_index],
+                i,
+                return_data[i],
+            )
 
         self._communicators.starmap(
             self._send_shard,
@@ -1641,34 +1686,21 @@ class HeartsRequestHandler(BaseRequestHandler):
                 self.server.num_illegals,
             )
             print(results_table)
-            results_table: bytes = server_utils.encode_data(
+            encoded_results_table = server_utils.encode_data(
                 '\n' + results_table)
 
-            return_data: List[Tuple[  # type: ignore[no-redef]
-                int,
-                MultiObservation,
-                MultiReward,
-                MultiIsDone,
-                MultiInfo,
-            ]] = [(i,) + data for (i, data) in enumerate(return_data)]
-            return_data: bytes = (  # type: ignore[no-redef]
-                self._encode_data(return_data)
-            )
-            self.server.logger.debug('Return data:', return_data)
+            columns = self._empty_columns(True)
+            for (i, data) in enumerate(return_data):
+                self._append_row(columns, i, data)
+            encoded_return_data = self._encode_data(columns)
+            self.server.logger.debug('Return data:', encoded_return_data)
 
+            # Both messages are length-prefixed, so send them at once and
+            # only wait for a single 'OK' message afterwards.
+            end_of_game_data = encoded_return_data + encoded_results_table
             self._communicators.map(
                 lambda client: self.server.send_failable_replacing(
-                    client, return_data),
-                (clients[i] for i in range(num_players)),
-            )
-            self._communicators.map(
-                lambda client: self.server.receive_ok_replacing(
-                    client, self.OK_TIMEOUT_SEC),
-                (clients[i] for i in range(num_players)),
-            )
-            self._communicators.map(
-                lambda client: self.server.send_failable_replacing(
-                    client, results_table),
+                    client, end_of_game_data),
                 (clients[i] for i in range(num_players)),
             )
             self._communicators.map(
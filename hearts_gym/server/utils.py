@@ -2,12 +2,16 @@
 Utilities for client-server interaction.
 """
 
-import json
 import socket
-from typing import Any, List, Optional, Tuple
+import struct
+import threading
+from typing import Any, List, Optional, Tuple, Type, Union
 import zlib
 
+import msgpack
+import numpy as np
 from ray.rllib.utils.typing import TensorType
+import zstandard
 
 from hearts_gym.utils.typing import Action
 
@@ -27,6 +31,56 @@ MAX_MSG_PREFIX_LENGTH = len(str(MAX_MSG_BYTES)) + len(MSG_LENGTH_SEPARATOR)
 """Maximum string length of the message length prefix, including
 the separator.
 """
+MSG_LENGTH_STRUCT = struct.Struct('!I')
+"""Binary length prefix of messages from server to client.
+
+Messages from client to server are prefixed with their length as a
+string followed by `MSG_LENGTH_SEPARATOR` instead.
+"""
+
+COMPRESSION_ZLIB = b'z'
+"""Header byte of messages compressed with zlib."""
+COMPRESSION_ZSTD = b's'
+"""Header byte of messages compressed with Zstandard."""
+DEFAULT_COMPRESSION = COMPRESSION_ZSTD
+"""Compression used for encoding messages from server to client.
+
+Zstandard is used as it decompresses considerably faster than zlib.
+"""
+
+DECODE_ERRORS: Tuple[Type[Exception], ...] = (
+    ValueError,
+    msgpack.UnpackException,
+    zlib.error,
+    zstandard.ZstdError,
+)
+"""Errors that may be raised when decoding a malformed message."""
+
+INDICES_KEY = 'indices'
+"""Key of the environment indices in observation messages."""
+OBS_KEY = 'obs'
+"""Key of the observations in observation messages."""
+REWARDS_KEY = 'rewards'
+"""Key of the rewards in observation messages.
+
+Only present after a step, not after a reset.
+"""
+IS_DONES_KEY = 'is_dones'
+"""Key of the done flags in observation messages.
+
+Only present after a step, not after a reset.
+"""
+INFOS_KEY = 'infos'
+"""Key of the info dictionaries in observation messages.
+
+Only present after a step, not after a reset.
+"""
+
+NDARRAY_EXT_TYPE = 1
+"""MessagePack extension type code of NumPy arrays."""
+
+_thread_contexts = threading.local()
+"""Per-thread packers and (de-)compressors as they are not thread-safe."""
 
 
 def prefix_data(data: bytes) -> bytes:
@@ -43,6 +97,21 @@ def prefix_data(data: bytes) -> bytes:
     return str(data_len).encode() + MSG_LENGTH_SEPARATOR + data
 
 
+def prefix_data_binary(data: bytes) -> bytes:
+    """Return the given data prefixed with its length packed as
+    `MSG_LENGTH_STRUCT`.
+
+    Args:
+        data (bytes): Data to prefix.
+
+    Returns:
+        bytes: Prefixed data ready for unknown-length receipt.
+    """
+    data_len = len(data)
+    assert data_len <= MAX_MSG_BYTES, 'message is too large'
+    return MSG_LENGTH_STRUCT.pack(data_len) + data
+
+
 def encode_int(integer: int) -> bytes:
     """Return the given integer encoded as a bytes string.
 
@@ -90,6 +159,127 @@ def decode_actions(data: bytes) -> List[Action]:
     return list(map(int, data.split(ACTION_SEPARATOR)))
 
 
+def _get_zstd_compressor() -> zstandard.ZstdCompressor:
+    """Return the Zstandard compressor of the current thread.
+
+    Returns:
+        zstandard.ZstdCompressor: Compressor to be used only by the
+            current thread.
+    """
+    try:
+        return _thread_contexts.compressor
+    except AttributeError:
+        _thread_contexts.compressor = zstandard.ZstdCompressor()
+        return _thread_contexts.compressor
+
+
+def _get_zstd_decompressor() -> zstandard.ZstdDecompressor:
+    """Return the Zstandard decompressor of the current thread.
+
+    Returns:
+        zstandard.ZstdDecompressor: Decompressor to be used only by the
+            current thread.
+    """
+    try:
+        return _thread_contexts.decompressor
+    except AttributeError:
+        _thread_contexts.decompressor = zstandard.ZstdDecompressor()
+        return _thread_contexts.decompressor
+
+
+def compress(data: bytes, compression: bytes = DEFAULT_COMPRESSION) -> bytes:
+    """Return the given data compressed and prefixed with a header byte
+    indicating the compression used.
+
+    Args:
+        data (bytes): Data to compress.
+        compression (bytes): Header byte of the compression to use.
+
+    Returns:
+        bytes: Header byte followed by the compressed data.
+    """
+    if compression == COMPRESSION_ZSTD:
+        return compression + _get_zstd_compressor().compress(data)
+    elif compression == COMPRESSION_ZLIB:
+        return compression + zlib.compress(data)
+    raise ValueError(f'unknown compression {compression!r}')
+
+
+def decompress(data: Union[bytes, memoryview]) -> bytes:
+    """Return the given data decompressed according to its header byte.
+
+    Args:
+        data (Union[bytes, memoryview]): Header byte followed by
+            compressed data.
+
+    Returns:
+        bytes: Decompressed data.
+    """
+    compression = bytes(data[:1])
+    if compression == COMPRESSION_ZSTD:
+        return _get_zstd_decompressor().decompress(data[1:])
+    elif compression == COMPRESSION_ZLIB:
+        return zlib.decompress(data[1:])
+    raise ValueError(f'unknown compression {compression!r}')
+
+
+def _pack_default(obj: Any) -> Any:
+    """Return the given object converted to something MessagePack
+    is able to serialize.
+
+    NumPy arrays are packed as raw buffers into an extension type so
+    they do not have to be converted element by element.
+
+    Args:
+        obj (Any): Object MessagePack is unable to serialize.
+
+    Returns:
+        Any: Serializable representation of `obj`.
+    """
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.hasobject:
+            return obj.tolist()
+        return msgpack.ExtType(NDARRAY_EXT_TYPE, msgpack.packb((
+            obj.dtype.str,
+            obj.shape,
+            np.ascontiguousarray(obj).data,
+        )))
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f'cannot serialize {type(obj)!r}')
+
+
+def _unpack_ext_hook(code: int, data: bytes) -> Any:
+    """Return the object encoded in the given MessagePack
+    extension type.
+
+    Args:
+        code (int): Extension type code.
+        data (bytes): Data of the extension type.
+
+    Returns:
+        Any: Object encoded in the extension type. NumPy arrays are
+            read-only views on the received data.
+    """
+    if code == NDARRAY_EXT_TYPE:
+        (dtype, shape, buffer) = msgpack.unpackb(data)
+        return np.frombuffer(buffer, dtype=dtype).reshape(shape)
+    return msgpack.ExtType(code, data)
+
+
+def _get_packer() -> msgpack.Packer:
+    """Return the MessagePack packer of the current thread.
+
+    Returns:
+        msgpack.Packer: Packer to be used only by the current thread.
+    """
+    try:
+        return _thread_contexts.packer
+    except AttributeError:
+        _thread_contexts.packer = msgpack.Packer(default=_pack_default)
+        return _thread_contexts.packer
+
+
 def encode_data(data: Any) -> bytes:
     """Return the given data encoded as a message from server to client.
 
@@ -97,41 +287,59 @@ def encode_data(data: Any) -> bytes:
         data (Any): Data to encode for sending.
 
     Returns:
-        bytes: Encoded data, prefixed with the length of the data and
-            a `MSG_LENGTH_SEPARATOR`.
+        bytes: Encoded data, prefixed with the length of the data
+            packed as `MSG_LENGTH_STRUCT`.
     """
-    data: str = json.dumps(data, separators=(',', ':'))
-    data: bytes = data.encode()
-    data: bytes = zlib.compress(data)
-    data: bytes = prefix_data(data)
+    data: bytes = _get_packer().pack(data)
+    data: bytes = compress(data)
+    data: bytes = prefix_data_binary(data)
     return data
 
 
-def decode_data(data: bytes) -> Any:
+def decode_data(data: Union[bytes, memoryview]) -> Any:
     """Return the given data decoded from a message from server
     to client.
 
     It is assumed that the data has been stripped of its prefix.
 
     Args:
-        data (bytes): Received data to decode.
+        data (Union[bytes, memoryview]): Received data to decode.
 
     Returns:
         Any: Decoded data.
     """
-    data: bytes = zlib.decompress(data)
-    data: str = data.decode()
-    data: Any = json.loads(data)
+    data: bytes = decompress(data)
+    data: Any = msgpack.unpackb(
+        data,
+        ext_hook=_unpack_ext_hook,
+        strict_map_key=False,
+    )
     return data
 
 
+def disable_nagle(sock: socket.socket) -> None:
+    """Disable Nagle's algorithm on the given socket so that messages
+    are transmitted immediately instead of waiting for outstanding
+    acknowledgements.
+
+    As communication happens in lock-step, there is never more data to
+    wait for that could be sent together with a message.
+
+    Args:
+        sock (socket.socket): TCP socket to configure.
+    """
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
 def create_client() -> socket.socket:
     """Return a socket for connecting to a server.
 
     Returns:
         socket.socket: Client socket.
     """
-    return socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    disable_nagle(client)
+    return client
 
 
 def send_name(client: socket.socket, name: Optional[str]) -> None:
@@ -207,12 +207,23 @@ def compute_actions(self,
     # Preprocess obs and states
     stateDefined = state is not None
     policy = self.get_policy(policy_id)
-    filtered_obs, filtered_state = [], []
+    worker = self.workers.local_worker()
+    preprocessor = worker.preprocessors[policy_id]
+    obs_filter = worker.filters[policy_id]
+    # Filled in-place once we know the shape of a preprocessed
+    # observation; saves collecting the observations in a list just to
+    # stack them afterwards.
+    obs_batch = None
+    filtered_state = []
     for (i, ob) in enumerate(observations):
-        worker = self.workers.local_worker()
-        preprocessed = worker.preprocessors[policy_id].transform(ob)
-        filtered = worker.filters[policy_id](preprocessed, update=False)
-        filtered_obs.append(filtered)
+        preprocessed = preprocessor.transform(ob)
+        filtered = np.asarray(obs_filter(preprocessed, update=False))
+        if obs_batch is None:
+            obs_batch = np.empty(
+                (len(observations),) + filtered.shape,
+                dtype=filtered.dtype,
+            )
+        obs_batch[i] = filtered
         if state is None:
             continue
         elif len(state) > i:
@@ -220,8 +231,7 @@ def compute_actions(self,
         else:
             filtered_state.append(policy.get_initial_state())
 
-    # Batch obs and states
-    obs_batch = np.stack(filtered_obs)
+    # Batch states
     if state is None:
         state = []
     else:
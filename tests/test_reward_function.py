@@ -0,0 +1,70 @@
+import unittest
+
+from hearts_gym import HeartsEnv
+from hearts_gym.envs.card_deck import Card
+
+
+class TestRewardFunction(unittest.TestCase):
+    def setUp(self):
+        self.env = HeartsEnv(seed=0)
+        self.env.reset()
+        self.game = self.env.game
+        self.reward_function = self.env.reward_function
+
+        # Start from a plain situation: everyone played a legal club,
+        # nobody won a trick and nobody shot the moon.
+        self.set_played_cards(Card(Card.SUIT_CLUB, 0))
+        self.game.prev_leading_suit = Card.SUIT_CLUB
+        self.game.prev_trick_winner_index = None
+        self.game.prev_trick_penalty = None
+        self.game.has_shot_the_moon = lambda player_index: False
+
+    def set_played_cards(self, card):
+        game = self.game
+        for i in range(game.num_players):
+            game.prev_was_illegals[i] = False
+            game.prev_played_cards[i] = card
+
+    def compute_reward(self, trick_is_over=False):
+        return self.reward_function(0, 1, trick_is_over)
+
+    def test_illegal(self):
+        self.game.prev_was_illegals[0] = True
+        self.game.prev_leading_suit = Card.SUIT_HEART
+        self.assertEqual(self.compute_reward(), -26 * 13)
+
+    def test_hearts_lead(self):
+        self.game.prev_leading_suit = Card.SUIT_HEART
+        self.assertEqual(self.compute_reward(), 13)
+
+    def test_no_card(self):
+        self.set_played_cards(None)
+        self.assertEqual(self.compute_reward(), 0)
+
+    def test_shot_the_moon(self):
+        self.game.prev_trick_winner_index = 0
+        self.game.prev_trick_penalty = 13
+        self.game.has_shot_the_moon = \
+            lambda player_index: player_index == 0
+        self.assertEqual(self.compute_reward(True), 26 * 13)
+        # Only rewarded once the trick is over.
+        self.assertEqual(self.compute_reward(False), -13 * 13)
+
+    def test_queen_of_spades_trick(self):
+        self.game.prev_trick_winner_index = 0
+        self.game.prev_trick_penalty = 13
+        self.assertEqual(self.compute_reward(True), -13 * 13)
+
+    def test_trick_winner(self):
+        self.game.prev_trick_winner_index = 0
+        self.game.prev_trick_penalty = 2
+        self.assertEqual(self.compute_reward(True), -2)
+
+    def test_ordinary(self):
+        self.game.prev_trick_winner_index = 2
+        self.game.prev_trick_penalty = 2
+        self.assertEqual(self.compute_reward(True), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
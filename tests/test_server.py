@@ -2,8 +2,8 @@ import subprocess
 import time
 import unittest
 
-from hearts_gym.envs import hearts_server
-from hearts_gym.envs import server_utils
+from hearts_gym.server import hearts_server
+from hearts_gym.server import utils as server_utils
 
 
 class TestCommon(unittest.TestCase):
@@ -14,7 +14,8 @@ class TestCommon(unittest.TestCase):
             'test3': {},
         }
         encoded = server_utils.encode_data(original)
-        decoded = server_utils.decode_data(encoded)
+        prefix_length = server_utils.MSG_LENGTH_STRUCT.size
+        decoded = server_utils.decode_data(encoded[prefix_length:])
         self.assertEqual(original, decoded)
 
     def test_runs_and_quits(self):
@@ -0,0 +1,80 @@
+import unittest
+
+import numpy as np
+
+from hearts_gym.server import utils as server_utils
+
+
+class TestEncoding(unittest.TestCase):
+    def encode_decode(self, data, compression):
+        encoded = server_utils.encode_data(data)
+
+        prefix_length = server_utils.MSG_LENGTH_STRUCT.size
+        (data_length,) = server_utils.MSG_LENGTH_STRUCT.unpack(
+            encoded[:prefix_length])
+        encoded = encoded[prefix_length:]
+        self.assertEqual(data_length, len(encoded))
+        self.assertEqual(encoded[:1], server_utils.DEFAULT_COMPRESSION)
+
+        if compression != server_utils.DEFAULT_COMPRESSION:
+            encoded = server_utils.compress(
+                server_utils.decompress(encoded),
+                compression,
+            )
+            self.assertEqual(encoded[:1], compression)
+        return server_utils.decode_data(memoryview(encoded))
+
+    def test_round_trip(self):
+        original = {
+            0: np.arange(-3, 3, dtype=np.int8).reshape(2, 3),
+            1: np.array([True, False, True]),
+            'zero_dim': np.array(7, dtype=np.int8),
+            'test': [1, 2, 3],
+            'test2': {},
+        }
+        for compression in [
+                server_utils.COMPRESSION_ZLIB,
+                server_utils.COMPRESSION_ZSTD,
+        ]:
+            with self.subTest(compression=compression):
+                decoded = self.encode_decode(original, compression)
+                self.assertEqual(decoded.keys(), original.keys())
+                for key in [0, 1, 'zero_dim']:
+                    array = decoded[key]
+                    self.assertIsInstance(array, np.ndarray)
+                    self.assertEqual(array.dtype, original[key].dtype)
+                    self.assertEqual(array.shape, original[key].shape)
+                    self.assertTrue(np.array_equal(array, original[key]))
+                    self.assertFalse(array.flags.writeable)
+                self.assertEqual(decoded['test'], original['test'])
+                self.assertEqual(decoded['test2'], original['test2'])
+
+    def test_string(self):
+        original = '\nthis is a test string'
+        for compression in [
+                server_utils.COMPRESSION_ZLIB,
+                server_utils.COMPRESSION_ZSTD,
+        ]:
+            with self.subTest(compression=compression):
+                decoded = self.encode_decode(original, compression)
+                self.assertEqual(decoded, original)
+
+    def test_malformed(self):
+        packed = server_utils.compress(b'\xc1', server_utils.COMPRESSION_ZLIB)
+        truncated = server_utils.encode_data({'test': [1, 2, 3]})[
+            server_utils.MSG_LENGTH_STRUCT.size:-1]
+        for data in [
+                b'',
+                b'xtest',
+                server_utils.COMPRESSION_ZLIB + b'test',
+                server_utils.COMPRESSION_ZSTD + b'test',
+                packed,
+                truncated,
+        ]:
+            with self.subTest(data=data):
+                with self.assertRaises(server_utils.DECODE_ERRORS):
+                    server_utils.decode_data(data)
+
+
+if __name__ == '__main__':
+    unittest.main()